@@ -73,7 +73,7 @@ For each item, note which agent(s) identified it."""
 
     synthesis = await swarm.run_prompt(synthesis_prompt)
     
-    swarm.save(state_file)
+    await swarm.asave(state_file)
     
     return {
         "target": target_path,
@@ -0,0 +1,248 @@
+"""Anthropic API backends for tool-less prompts."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import uuid
+from typing import Any
+
+import orjson
+
+try:
+    import httpx
+except ImportError:  # Optional dependency: pip install 'claude-swarm[api]'
+    httpx = None
+
+API_URL = "https://api.anthropic.com"
+API_VERSION = "2023-06-01"
+DEFAULT_MODEL = "claude-sonnet-4-5"
+DEFAULT_MAX_TOKENS = 4096
+
+
+def api_headers() -> dict[str, str]:
+    """Build request headers from the ANTHROPIC_API_KEY environment variable."""
+    api_key = os.environ.get("ANTHROPIC_API_KEY")
+    if not api_key:
+        raise RuntimeError("ANTHROPIC_API_KEY must be set to use the Anthropic API")
+    return {"x-api-key": api_key, "anthropic-version": API_VERSION}
+
+
+def require_httpx() -> None:
+    """Raise a helpful error if the optional httpx dependency is missing."""
+    if httpx is None:
+        raise ImportError(
+            "The Anthropic API backends require httpx. "
+            "Install with: pip install 'claude-swarm[api]'"
+        )
+
+
+def create_client(max_connections: int) -> httpx.AsyncClient:
+    """Create a keep-alive HTTP/2 client shared by every request from a swarm."""
+    require_httpx()
+    return httpx.AsyncClient(
+        base_url=API_URL,
+        headers=api_headers(),
+        http2=True,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+        ),
+        timeout=httpx.Timeout(600.0, connect=10.0),
+    )
+
+
+async def create_message(
+    client: httpx.AsyncClient,
+    prompt: str,
+    model: str = DEFAULT_MODEL,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+) -> dict[str, Any]:
+    """Send a single prompt to the Messages API."""
+    try:
+        resp = await client.post("/v1/messages", json={
+            "model": model,
+            "max_tokens": max_tokens,
+            "messages": [{"role": "user", "content": prompt}],
+        })
+    except httpx.HTTPError as e:
+        return {"success": False, "error": str(e)}
+
+    if resp.is_error:
+        return error_result(resp)
+    return {"success": True, "result": message_result(resp.json())}
+
+
+def message_result(message: dict) -> dict[str, Any]:
+    """Shape a Messages API response like `claude --output-format json` output."""
+    text = "".join(
+        block.get("text", "")
+        for block in message.get("content", [])
+        if block.get("type") == "text"
+    )
+    return {
+        "type": "result",
+        "result": text,
+        "model": message.get("model"),
+        "stop_reason": message.get("stop_reason"),
+        "usage": message.get("usage"),
+    }
+
+
+def error_result(resp: Any) -> dict[str, Any]:
+    """Convert a failed HTTP response into a swarm error result."""
+    try:
+        message = resp.json()["error"]["message"]
+    except (ValueError, KeyError, TypeError):
+        message = resp.text
+    return {"success": False, "error": message.strip(), "status_code": resp.status_code}
+
+
+def _batch_entry_result(result: dict) -> dict[str, Any]:
+    """Convert a single Message Batches result entry into a swarm result."""
+    if result.get("type") == "succeeded":
+        return {"success": True, "result": message_result(result["message"])}
+    if result.get("type") == "errored":
+        error = result.get("error", {})
+        error = error.get("error", error)
+        return {"success": False, "error": error.get("message", str(error))}
+    return {"success": False, "error": f"Batch request {result.get('type', 'failed')}"}
+
+
+class BatchExecutor:
+    """
+    Collect prompts and submit them together through the Message Batches API.
+
+    Prompts submitted within `window` seconds of the first queued prompt
+    (e.g. from `asyncio.gather` in `fan_out` or `dispatch`, or any burst of
+    concurrent `invoke` calls) are sent as a single batch. Each prompt gets
+    a `custom_id`, and results are routed back to the awaiting caller once
+    the batch has ended. A window holding a single prompt is sent straight
+    to the Messages API instead, since batching it would only add latency.
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        model: str = DEFAULT_MODEL,
+        max_tokens: int = DEFAULT_MAX_TOKENS,
+        poll_interval: float = 5.0,
+        window: float = 0.01,
+    ):
+        self.client = client
+        self.model = model
+        self.max_tokens = max_tokens
+        self.poll_interval = poll_interval
+        self.window = window
+        self._pending: dict[str, tuple[str, asyncio.Future]] = {}
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._batches: set[asyncio.Task] = set()
+
+    async def submit(self, prompt: str) -> dict[str, Any]:
+        """Queue a prompt for the next batch and wait for its result."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending[uuid.uuid4().hex] = (prompt, future)
+
+        if self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush)
+
+        return await future
+
+    async def aclose(self) -> None:
+        """Cancel the pending flush and any in-flight batches, failing their prompts."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, {}
+        for _, future in pending.values():
+            if not future.done():
+                future.set_exception(RuntimeError("Batch executor was closed before the prompt was sent"))
+        for task in self._batches:
+            task.cancel()
+        await asyncio.gather(*self._batches, return_exceptions=True)
+
+    def _flush(self) -> None:
+        """Send everything queued during the window as one batch."""
+        self._flush_handle = None
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return
+
+        if len(pending) == 1:
+            task = asyncio.ensure_future(self._run_single(*pending.values()))
+        else:
+            task = asyncio.ensure_future(self._run_batch(pending))
+        self._batches.add(task)
+        task.add_done_callback(self._batches.discard)
+
+    async def _run_single(self, item: tuple[str, asyncio.Future]) -> None:
+        prompt, future = item
+        try:
+            result = await create_message(self.client, prompt, self.model, self.max_tokens)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            return
+        if not future.done():
+            future.set_result(result)
+
+    async def _run_batch(self, pending: dict[str, tuple[str, asyncio.Future]]) -> None:
+        try:
+            results = await self._execute(pending)
+        except asyncio.CancelledError:
+            for _, future in pending.values():
+                future.cancel()
+            raise
+        except Exception as e:
+            for _, future in pending.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for custom_id, (_, future) in pending.items():
+            if not future.done():
+                future.set_result(results.get(
+                    custom_id,
+                    {"success": False, "error": "No result returned for batch request"},
+                ))
+
+    async def _execute(
+        self,
+        pending: dict[str, tuple[str, asyncio.Future]],
+    ) -> dict[str, dict[str, Any]]:
+        """Create a batch, poll until it ends, and collect results by custom_id."""
+        requests = [
+            {
+                "custom_id": custom_id,
+                "params": {
+                    "model": self.model,
+                    "max_tokens": self.max_tokens,
+                    "messages": [{"role": "user", "content": prompt}],
+                },
+            }
+            for custom_id, (prompt, _) in pending.items()
+        ]
+
+        try:
+            resp = await self.client.post("/v1/messages/batches", json={"requests": requests})
+            while not resp.is_error and resp.json()["processing_status"] != "ended":
+                await asyncio.sleep(self.poll_interval)
+                resp = await self.client.get(f"/v1/messages/batches/{resp.json()['id']}")
+            if not resp.is_error:
+                resp = await self.client.get(resp.json()["results_url"])
+        except httpx.HTTPError as e:
+            return {custom_id: {"success": False, "error": str(e)} for custom_id in pending}
+
+        if resp.is_error:
+            return {custom_id: error_result(resp) for custom_id in pending}
+
+        results = {}
+        for line in resp.text.splitlines():
+            if line.strip():
+                entry = orjson.loads(line)
+                results[entry["custom_id"]] = _batch_entry_result(entry["result"])
+        return results
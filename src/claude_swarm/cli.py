@@ -5,11 +5,14 @@ from __future__ import annotations
 
 import argparse
 import asyncio
+import itertools
 import json
+import sqlite3
 import sys
 from pathlib import Path
 
-from .swarm import Swarm
+from .persistence import SwarmStore
+from .swarm import EXECUTION_MODES, Swarm, SwarmState
 from .patterns import fan_out, pipeline, hierarchical, competitive, map_reduce
 
 # Tool profiles for common use cases
@@ -34,40 +37,28 @@ TOOL_PROFILES = {
 }
 
 
+# De-duplicated tool tuples per profile, built once at import
+_PROFILE_SETS = {name: tuple(dict.fromkeys(tools)) for name, tools in TOOL_PROFILES.items()}
+_PROFILE_KEYS = tuple(TOOL_PROFILES)
+
+
 def resolve_tools(args: argparse.Namespace) -> list[str] | None:
     """Resolve --allowed-tools and --profile to a list of tools."""
-    tools = []
-
-    # Handle --profile
     profile = getattr(args, 'profile', None)
-    if profile:
-        if profile not in TOOL_PROFILES:
-            print(f"Unknown profile: {profile}. Available: {', '.join(TOOL_PROFILES.keys())}")
-            sys.exit(1)
-        tools.extend(TOOL_PROFILES[profile])
+    if profile and profile not in _PROFILE_SETS:
+        print(f"Unknown profile: {profile}. Available: {', '.join(_PROFILE_KEYS)}")
+        sys.exit(1)
 
-    # Handle --allowed-tools
     allowed = getattr(args, 'allowed_tools', None)
-    if allowed:
-        for tool in allowed:
-            if tool.lower() == "all":
-                tools.extend(TOOL_PROFILES["all"])
-            elif tool in TOOL_PROFILES:
-                tools.extend(TOOL_PROFILES[tool])
-            else:
-                tools.append(tool)
-
-    # Deduplicate while preserving order
-    if tools:
-        seen = set()
-        unique = []
-        for t in tools:
-            if t not in seen:
-                seen.add(t)
-                unique.append(t)
-        return unique
+    if not allowed:
+        return list(_PROFILE_SETS[profile]) if profile else None
 
-    return None
+    # Expand 'all' and profile names, then deduplicate preserving order
+    expanded = (
+        _PROFILE_SETS["all"] if tool.lower() == "all" else _PROFILE_SETS.get(tool, (tool,))
+        for tool in allowed
+    )
+    return list(dict.fromkeys(itertools.chain(_PROFILE_SETS.get(profile, ()), *expanded)))
 
 
 def add_tool_args(parser: argparse.ArgumentParser) -> None:
@@ -77,11 +68,20 @@ def add_tool_args(parser: argparse.ArgumentParser) -> None:
         help="Tools to allow (e.g. WebSearch WebFetch). Use 'all' for all tools.",
     )
     parser.add_argument(
-        "--profile", choices=list(TOOL_PROFILES.keys()),
+        "--profile", choices=_PROFILE_KEYS,
         help="Tool profile: all, build, research, code, readonly",
     )
 
 
+def add_execution_args(parser: argparse.ArgumentParser) -> None:
+    """Add the --execution-mode argument to a parser."""
+    parser.add_argument(
+        "--execution-mode", choices=EXECUTION_MODES, default="cli",
+        help="cli: one claude subprocess per prompt; api: send tool-less prompts "
+             "to the Anthropic Messages API; batch: submit them via the Message Batches API",
+    )
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         prog="claude-swarm",
@@ -96,12 +96,18 @@ def parse_args() -> argparse.Namespace:
     fanout.add_argument("--cwd", default=".", help="Working directory")
     fanout.add_argument("--max-concurrent", type=int, default=5)
     add_tool_args(fanout)
+    add_execution_args(fanout)
 
     # Pipeline command
     pipe = subparsers.add_parser("pipeline", help="Run tasks sequentially")
     pipe.add_argument("stages", nargs="+", help="Pipeline stages")
     pipe.add_argument("--cwd", default=".", help="Working directory")
+    pipe.add_argument(
+        "--speculative", action="store_true",
+        help="Start each next stage's claude process while the current stage runs",
+    )
     add_tool_args(pipe)
+    add_execution_args(pipe)
 
     # Hierarchical command
     hier = subparsers.add_parser("hierarchical", help="Plan, execute, synthesize")
@@ -110,6 +116,7 @@ def parse_args() -> argparse.Namespace:
     hier.add_argument("--max-subtasks", type=int, default=5)
     hier.add_argument("--max-concurrent", type=int, default=5)
     add_tool_args(hier)
+    add_execution_args(hier)
 
     # Competitive command
     comp = subparsers.add_parser("competitive", help="Multiple agents compete")
@@ -117,6 +124,7 @@ def parse_args() -> argparse.Namespace:
     comp.add_argument("--num-agents", type=int, default=3)
     comp.add_argument("--cwd", default=".", help="Working directory")
     add_tool_args(comp)
+    add_execution_args(comp)
 
     # Map-reduce command
     mr = subparsers.add_parser("map-reduce", help="Map over items, reduce results")
@@ -126,6 +134,7 @@ def parse_args() -> argparse.Namespace:
     mr.add_argument("--cwd", default=".", help="Working directory")
     mr.add_argument("--max-concurrent", type=int, default=5)
     add_tool_args(mr)
+    add_execution_args(mr)
     
     # Profiles command
     profiles = subparsers.add_parser("profiles", help="List available tool profiles")
@@ -139,45 +148,58 @@ def parse_args() -> argparse.Namespace:
     add_agent.add_argument("name", help="Agent name")
     add_agent.add_argument("--role", required=True, help="Agent role")
     add_agent.add_argument("--system-prompt", default="", help="System prompt")
-    add_agent.add_argument("--state-file", default=".swarm_state.json")
+    add_agent.add_argument("--state-file", default=".swarm_state.db")
     
     # manage remove-agent
     rm_agent = manage_sub.add_parser("remove-agent", help="Remove an agent")
     rm_agent.add_argument("name", help="Agent name")
-    rm_agent.add_argument("--state-file", default=".swarm_state.json")
+    rm_agent.add_argument("--state-file", default=".swarm_state.db")
     
     # manage list-agents
     list_agents = manage_sub.add_parser("list-agents", help="List agents")
-    list_agents.add_argument("--state-file", default=".swarm_state.json")
+    list_agents.add_argument("--state-file", default=".swarm_state.db")
     
     # manage invoke
     invoke = manage_sub.add_parser("invoke", help="Invoke an agent")
     invoke.add_argument("agent", help="Agent name")
     invoke.add_argument("task", help="Task for agent")
     invoke.add_argument("--cwd", default=".")
-    invoke.add_argument("--state-file", default=".swarm_state.json")
+    invoke.add_argument("--state-file", default=".swarm_state.db")
+    add_execution_args(invoke)
     
     # manage dispatch
     dispatch = manage_sub.add_parser("dispatch", help="Dispatch to multiple agents")
     dispatch.add_argument("--assignments", nargs="+", help="agent:task pairs")
     dispatch.add_argument("--cwd", default=".")
-    dispatch.add_argument("--state-file", default=".swarm_state.json")
+    dispatch.add_argument("--state-file", default=".swarm_state.db")
+    add_execution_args(dispatch)
     
     # manage broadcast
     broadcast = manage_sub.add_parser("broadcast", help="Broadcast to all agents")
     broadcast.add_argument("task", help="Task for all agents")
     broadcast.add_argument("--cwd", default=".")
-    broadcast.add_argument("--state-file", default=".swarm_state.json")
+    broadcast.add_argument("--state-file", default=".swarm_state.db")
+    add_execution_args(broadcast)
     
     # manage set-context
     set_ctx = manage_sub.add_parser("set-context", help="Set shared context")
     set_ctx.add_argument("key", help="Context key")
     set_ctx.add_argument("value", help="Context value (JSON)")
-    set_ctx.add_argument("--state-file", default=".swarm_state.json")
+    set_ctx.add_argument("--state-file", default=".swarm_state.db")
     
     # manage show-context
     show_ctx = manage_sub.add_parser("show-context", help="Show shared context")
-    show_ctx.add_argument("--state-file", default=".swarm_state.json")
+    show_ctx.add_argument("--state-file", default=".swarm_state.db")
+    
+    # manage export
+    export = manage_sub.add_parser("export", help="Export swarm state as JSON")
+    export.add_argument("--output", default=".swarm_state.json", help="JSON file to write")
+    export.add_argument("--state-file", default=".swarm_state.db")
+    
+    # manage import
+    import_ = manage_sub.add_parser("import", help="Import a JSON state file")
+    import_.add_argument("input", help="JSON file to read (e.g. an old .swarm_state.json)")
+    import_.add_argument("--state-file", default=".swarm_state.db")
     
     return parser.parse_args()
 
@@ -192,6 +214,7 @@ async def run_command(args: argparse.Namespace) -> int:
             cwd=args.cwd,
             max_concurrent=args.max_concurrent,
             allowed_tools=allowed_tools,
+            execution_mode=args.execution_mode,
         )
 
     elif args.command == "pipeline":
@@ -199,6 +222,8 @@ async def run_command(args: argparse.Namespace) -> int:
             args.stages,
             cwd=args.cwd,
             allowed_tools=allowed_tools,
+            execution_mode=args.execution_mode,
+            speculative=args.speculative,
         )
 
     elif args.command == "hierarchical":
@@ -208,6 +233,7 @@ async def run_command(args: argparse.Namespace) -> int:
             max_subtasks=args.max_subtasks,
             max_concurrent=args.max_concurrent,
             allowed_tools=allowed_tools,
+            execution_mode=args.execution_mode,
         )
 
     elif args.command == "competitive":
@@ -216,6 +242,7 @@ async def run_command(args: argparse.Namespace) -> int:
             num_agents=args.num_agents,
             cwd=args.cwd,
             allowed_tools=allowed_tools,
+            execution_mode=args.execution_mode,
         )
 
     elif args.command == "map-reduce":
@@ -226,6 +253,7 @@ async def run_command(args: argparse.Namespace) -> int:
             cwd=args.cwd,
             max_concurrent=args.max_concurrent,
             allowed_tools=allowed_tools,
+            execution_mode=args.execution_mode,
         )
     
     elif args.command == "profiles":
@@ -245,64 +273,95 @@ async def run_command(args: argparse.Namespace) -> int:
 
 
 async def handle_manage(args: argparse.Namespace) -> dict | list | None:
-    state_file = args.state_file
+    # State used to live in a JSON file next to the database; carry it over
+    # the first time the database is created
+    legacy = Path(args.state_file).with_suffix(".json")
+    migrate = (
+        args.action != "import"
+        and not Path(args.state_file).exists()
+        and legacy.exists()
+    )
     
-    if args.action == "add-agent":
-        swarm = Swarm.load(state_file) if Path(state_file).exists() else Swarm()
-        agent = swarm.add_agent(
-            name=args.name,
-            role=args.role,
-            system_prompt=args.system_prompt,
+    try:
+        store = SwarmStore(args.state_file)
+    except sqlite3.DatabaseError as e:
+        print(
+            f"Cannot open {args.state_file}: {e}. State is now kept in SQLite; "
+            f"to migrate a JSON state file, run: claude-swarm manage import {args.state_file} "
+            f"--state-file .swarm_state.db"
         )
-        swarm.save(state_file)
-        return {"added": agent.to_dict()}
-    
-    elif args.action == "remove-agent":
-        swarm = Swarm.load(state_file)
-        removed = swarm.remove_agent(args.name)
-        swarm.save(state_file)
-        return {"removed": args.name, "success": removed}
-    
-    elif args.action == "list-agents":
-        swarm = Swarm.load(state_file)
-        return swarm.list_agents()
-    
-    elif args.action == "invoke":
-        swarm = Swarm.load(state_file, cwd=args.cwd)
-        result = await swarm.invoke(args.agent, args.task)
-        swarm.save(state_file)
-        return result
-    
-    elif args.action == "dispatch":
-        swarm = Swarm.load(state_file, cwd=args.cwd)
-        # Parse agent:task pairs
-        assignments = {}
-        for pair in args.assignments:
-            agent, task = pair.split(":", 1)
-            assignments[agent] = task
-        result = await swarm.dispatch(assignments)
-        swarm.save(state_file)
-        return result
-    
-    elif args.action == "broadcast":
-        swarm = Swarm.load(state_file, cwd=args.cwd)
-        result = await swarm.broadcast(args.task)
-        swarm.save(state_file)
-        return result
-    
-    elif args.action == "set-context":
-        swarm = Swarm.load(state_file) if Path(state_file).exists() else Swarm()
-        try:
-            value = json.loads(args.value)
-        except json.JSONDecodeError:
-            value = args.value
-        swarm.update_context(args.key, value)
-        swarm.save(state_file)
-        return {"context": swarm.state.shared_context}
+        sys.exit(1)
     
-    elif args.action == "show-context":
-        swarm = Swarm.load(state_file)
-        return swarm.state.shared_context
+    with store:
+        if migrate:
+            store.import_state(await asyncio.to_thread(SwarmState.load, legacy))
+            print(f"Imported {legacy} into {args.state_file}", file=sys.stderr)
+        
+        if args.action == "add-agent":
+            swarm = Swarm(store=store)
+            agent = swarm.add_agent(
+                name=args.name,
+                role=args.role,
+                system_prompt=args.system_prompt,
+            )
+            return {"added": agent.to_dict()}
+        
+        elif args.action == "remove-agent":
+            swarm = Swarm(store=store)
+            removed = swarm.remove_agent(args.name)
+            return {"removed": args.name, "success": removed}
+        
+        elif args.action == "list-agents":
+            swarm = Swarm(store=store)
+            return swarm.list_agents()
+        
+        elif args.action == "invoke":
+            async with Swarm(store=store, cwd=args.cwd, execution_mode=args.execution_mode) as swarm:
+                return await swarm.invoke(args.agent, args.task)
+        
+        elif args.action == "dispatch":
+            # Parse agent:task pairs
+            assignments = {}
+            for pair in args.assignments:
+                agent, task = pair.split(":", 1)
+                assignments[agent] = task
+            async with Swarm(store=store, cwd=args.cwd, execution_mode=args.execution_mode) as swarm:
+                return await swarm.dispatch(assignments)
+        
+        elif args.action == "broadcast":
+            async with Swarm(store=store, cwd=args.cwd, execution_mode=args.execution_mode) as swarm:
+                return await swarm.broadcast(args.task)
+        
+        elif args.action == "set-context":
+            swarm = Swarm(store=store)
+            try:
+                value = json.loads(args.value)
+            except json.JSONDecodeError:
+                value = args.value
+            swarm.update_context(args.key, value)
+            return {"context": swarm.state.shared_context}
+        
+        elif args.action == "show-context":
+            swarm = Swarm(store=store)
+            return swarm.state.shared_context
+        
+        elif args.action == "export":
+            swarm = Swarm(store=store)
+            await swarm.asave(args.output)
+            return {"exported": args.output}
+        
+        elif args.action == "import":
+            if not Path(args.input).exists():
+                print(f"State file not found: {args.input}")
+                sys.exit(1)
+            state = await asyncio.to_thread(SwarmState.load, args.input)
+            store.import_state(state)
+            return {
+                "imported": args.input,
+                "agents": len(state.agents),
+                "context_keys": len(state.shared_context),
+                "history": len(state.history),
+            }
     
     return None
 
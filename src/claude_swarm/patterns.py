@@ -3,23 +3,70 @@
 from __future__ import annotations
 
 import asyncio
-import json
+from string import Template
 from typing import Any
 
+import orjson
+
 from .swarm import Swarm
 
+# Prompt templates, parsed once at import. Large payloads (results from
+# earlier phases) are serialized once with `_to_json` and substituted in.
+_STAGE_PROMPT = Template("""$stage
+
+## Previous Stage Output
+$previous""")
+
+_PLAN_PROMPT = Template("""You are a planning coordinator. Break this goal into $max_subtasks or fewer independent subtasks that can be executed in parallel.
+
+Return ONLY a JSON array of task strings. No explanation, no markdown, just the JSON array.
+
+Goal: $goal""")
+
+_SYNTH_PROMPT = Template("""You are a synthesis coordinator. Combine these worker results into a cohesive response.
+
+## Original Goal
+$goal
+
+## Subtask Results
+$worker_results
+
+Provide a unified, coherent response that addresses the original goal.""")
+
+_JUDGE_PROMPT = Template("""You are a judge evaluating $num_agents solutions to this task:
+
+## Task
+$task
+
+## Solutions
+$solutions
+
+Evaluate each solution and select the best one. Explain your reasoning briefly, then output which solution index (0-$last_index) is best.""")
+
+_REDUCE_PROMPT = Template("""$reduce_prompt
+
+## Map Results
+$map_results""")
+
+
+def _to_json(obj: Any) -> str:
+    """Serialize a payload for inclusion in a prompt."""
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+
 
 async def fan_out(
     tasks: list[str],
     cwd: str = ".",
     max_concurrent: int = 5,
     allowed_tools: list[str] | None = None,
+    execution_mode: str = "cli",
 ) -> list[dict[str, Any]]:
     """
     Run multiple independent tasks in parallel.
     
     Each task gets its own Claude instance. Results are returned
-    in the same order as the input tasks.
+    in the same order as the input tasks. With `execution_mode="batch"`,
+    tool-less tasks are submitted together as one Message Batches request.
     
     Example:
         results = await fan_out([
@@ -28,17 +75,16 @@ async def fan_out(
             "Check ./src/models for N+1 queries",
         ])
     """
-    swarm = Swarm(max_concurrent=max_concurrent, cwd=cwd)
+    async with Swarm(max_concurrent=max_concurrent, cwd=cwd, execution_mode=execution_mode) as swarm:
 
-    async def run_task(idx: int, task: str) -> dict:
-        result = await swarm.run_prompt(task, allowed_tools=allowed_tools)
-        return {"index": idx, "task": task, **result}
-    
-    results = await asyncio.gather(*[
-        run_task(i, task) for i, task in enumerate(tasks)
-    ])
-    
-    return sorted(results, key=lambda x: x["index"])
+        async def run_task(idx: int, task: str) -> dict:
+            result = await swarm.run_prompt(task, allowed_tools=allowed_tools)
+            return {"index": idx, "task": task, **result}
+        
+        # gather returns results in submission order, so no re-sorting needed
+        return list(await asyncio.gather(*[
+            run_task(i, task) for i, task in enumerate(tasks)
+        ]))
 
 
 async def pipeline(
@@ -46,11 +92,15 @@ async def pipeline(
     cwd: str = ".",
     context_key: str = "previous_output",
     allowed_tools: list[str] | None = None,
+    execution_mode: str = "cli",
+    speculative: bool = False,
 ) -> dict[str, Any]:
     """
     Run tasks sequentially, passing output from each stage to the next.
     
     Each stage receives the output of the previous stage in its context.
+    With `speculative=True`, each next stage's `claude` process is started
+    as soon as the current stage begins answering, hiding its startup time.
     
     Example:
         result = await pipeline([
@@ -59,18 +109,44 @@ async def pipeline(
             "Add type hints and docstrings",
         ])
     """
-    swarm = Swarm(cwd=cwd)
     results = []
+    # Speculation only applies to prompts that run through the claude CLI
+    speculate = speculative and (execution_mode == "cli" or bool(allowed_tools))
+    next_proc: asyncio.Task | None = None
     
-    for i, stage in enumerate(stages):
-        if i > 0 and results:
-            prev = results[-1]
-            prompt = f"{stage}\n\n## Previous Stage Output\n{json.dumps(prev.get('result', ''), indent=2)}"
-        else:
-            prompt = stage
+    async with Swarm(cwd=cwd, execution_mode=execution_mode) as swarm:
+        
+        def spawn_next(event: dict) -> None:
+            nonlocal next_proc
+            if next_proc is None and event.get("type") == "assistant":
+                next_proc = asyncio.ensure_future(swarm.spawn(allowed_tools))
         
-        result = await swarm.run_prompt(prompt, allowed_tools=allowed_tools)
-        results.append({"stage": i, "prompt": stage, **result})
+        try:
+            for i, stage in enumerate(stages):
+                if i > 0 and results:
+                    prev = results[-1]
+                    prompt = _STAGE_PROMPT.substitute(
+                        stage=stage, previous=_to_json(prev.get('result', '')),
+                    )
+                else:
+                    prompt = stage
+                
+                process = await next_proc if next_proc is not None else None
+                next_proc = None
+                result = await swarm.run_prompt(
+                    prompt,
+                    allowed_tools=allowed_tools,
+                    on_event=spawn_next if speculate and i + 1 < len(stages) else None,
+                    process=process,
+                )
+                results.append({"stage": i, "prompt": stage, **result})
+        finally:
+            # Don't leave a speculative process behind if a stage raised
+            if next_proc is not None:
+                (proc,) = await asyncio.gather(next_proc, return_exceptions=True)
+                if isinstance(proc, asyncio.subprocess.Process):
+                    proc.kill()
+                    await proc.wait()
     
     return {
         "stages": results,
@@ -84,6 +160,7 @@ async def hierarchical(
     max_subtasks: int = 5,
     max_concurrent: int = 5,
     allowed_tools: list[str] | None = None,
+    execution_mode: str = "cli",
 ) -> dict[str, Any]:
     """
     Coordinator plans subtasks, workers execute in parallel, synthesizer combines.
@@ -99,43 +176,38 @@ async def hierarchical(
             cwd="~/projects/flask-api"
         )
     """
-    swarm = Swarm(max_concurrent=max_concurrent, cwd=cwd)
-    
-    # Phase 1: Planning
-    plan_prompt = f"""You are a planning coordinator. Break this goal into {max_subtasks} or fewer independent subtasks that can be executed in parallel.
-
-Return ONLY a JSON array of task strings. No explanation, no markdown, just the JSON array.
-
-Goal: {goal}"""
+    async with Swarm(max_concurrent=max_concurrent, cwd=cwd, execution_mode=execution_mode) as swarm:
+        # Phase 1: Planning
+        plan_prompt = _PLAN_PROMPT.substitute(max_subtasks=max_subtasks, goal=goal)
     
-    plan_result = await swarm.run_prompt(plan_prompt)
+        plan_result = await swarm.run_prompt(plan_prompt)
     
-    # Parse subtasks
-    try:
-        raw = plan_result.get("result", {})
-        if isinstance(raw, dict):
-            raw = raw.get("result", "[]")
-        subtasks = json.loads(raw) if isinstance(raw, str) else raw
-        if not isinstance(subtasks, list):
+        # Parse subtasks
+        try:
+            raw = plan_result.get("result", {})
+            if isinstance(raw, dict):
+                raw = raw.get("result", "[]")
+            subtasks = orjson.loads(raw) if isinstance(raw, str) else raw
+            if not isinstance(subtasks, list):
+                subtasks = [goal]
+        except (orjson.JSONDecodeError, TypeError):
             subtasks = [goal]
-    except (json.JSONDecodeError, TypeError):
-        subtasks = [goal]
     
-    # Phase 2: Parallel execution
-    worker_results = await fan_out(subtasks, cwd=cwd, max_concurrent=max_concurrent, allowed_tools=allowed_tools)
+        # Phase 2: Parallel execution
+        worker_results = await fan_out(
+            subtasks,
+            cwd=cwd,
+            max_concurrent=max_concurrent,
+            allowed_tools=allowed_tools,
+            execution_mode=execution_mode,
+        )
     
-    # Phase 3: Synthesis
-    synth_prompt = f"""You are a synthesis coordinator. Combine these worker results into a cohesive response.
-
-## Original Goal
-{goal}
-
-## Subtask Results
-{json.dumps(worker_results, indent=2)}
-
-Provide a unified, coherent response that addresses the original goal."""
+        # Phase 3: Synthesis
+        synth_prompt = _SYNTH_PROMPT.substitute(
+            goal=goal, worker_results=_to_json(worker_results),
+        )
     
-    synthesis = await swarm.run_prompt(synth_prompt)
+        synthesis = await swarm.run_prompt(synth_prompt)
     
     return {
         "goal": goal,
@@ -150,6 +222,7 @@ async def competitive(
     num_agents: int = 3,
     cwd: str = ".",
     allowed_tools: list[str] | None = None,
+    execution_mode: str = "cli",
 ) -> dict[str, Any]:
     """
     Multiple agents solve the same task independently, then a judge picks the best.
@@ -162,34 +235,36 @@ async def competitive(
             num_agents=3
         )
     """
-    swarm = Swarm(max_concurrent=num_agents, cwd=cwd)
-    
-    # Run same task with different "personas"
-    personas = [
-        "Focus on code clarity and readability.",
-        "Focus on optimal performance and efficiency.",
-        "Focus on robustness and edge case handling.",
-    ]
+    async with Swarm(max_concurrent=num_agents, cwd=cwd, execution_mode=execution_mode) as swarm:
+        # Run same task with different "personas"
+        personas = [
+            "Focus on code clarity and readability.",
+            "Focus on optimal performance and efficiency.",
+            "Focus on robustness and edge case handling.",
+        ]
     
-    tasks = [
-        f"{task}\n\nApproach: {personas[i % len(personas)]}"
-        for i in range(num_agents)
-    ]
+        tasks = [
+            f"{task}\n\nApproach: {personas[i % len(personas)]}"
+            for i in range(num_agents)
+        ]
     
-    solutions = await fan_out(tasks, cwd=cwd, max_concurrent=num_agents, allowed_tools=allowed_tools)
+        solutions = await fan_out(
+            tasks,
+            cwd=cwd,
+            max_concurrent=num_agents,
+            allowed_tools=allowed_tools,
+            execution_mode=execution_mode,
+        )
     
-    # Judge the solutions
-    judge_prompt = f"""You are a judge evaluating {num_agents} solutions to this task:
-
-## Task
-{task}
-
-## Solutions
-{json.dumps(solutions, indent=2)}
-
-Evaluate each solution and select the best one. Explain your reasoning briefly, then output which solution index (0-{num_agents-1}) is best."""
+        # Judge the solutions
+        judge_prompt = _JUDGE_PROMPT.substitute(
+            num_agents=num_agents,
+            task=task,
+            solutions=_to_json(solutions),
+            last_index=num_agents - 1,
+        )
     
-    judgment = await swarm.run_prompt(judge_prompt)
+        judgment = await swarm.run_prompt(judge_prompt)
     
     return {
         "task": task,
@@ -205,6 +280,7 @@ async def map_reduce(
     cwd: str = ".",
     max_concurrent: int = 5,
     allowed_tools: list[str] | None = None,
+    execution_mode: str = "cli",
 ) -> dict[str, Any]:
     """
     Map a prompt over items in parallel, then reduce the results.
@@ -218,16 +294,21 @@ async def map_reduce(
     """
     # Map phase
     map_tasks = [map_prompt.format(item=item) for item in items]
-    map_results = await fan_out(map_tasks, cwd=cwd, max_concurrent=max_concurrent, allowed_tools=allowed_tools)
+    map_results = await fan_out(
+        map_tasks,
+        cwd=cwd,
+        max_concurrent=max_concurrent,
+        allowed_tools=allowed_tools,
+        execution_mode=execution_mode,
+    )
 
     # Reduce phase
-    swarm = Swarm(cwd=cwd)
-    full_reduce = f"""{reduce_prompt}
-
-## Map Results
-{json.dumps(map_results, indent=2)}"""
+    full_reduce = _REDUCE_PROMPT.substitute(
+        reduce_prompt=reduce_prompt, map_results=_to_json(map_results),
+    )
 
-    reduce_result = await swarm.run_prompt(full_reduce, allowed_tools=allowed_tools)
+    async with Swarm(cwd=cwd, execution_mode=execution_mode) as swarm:
+        reduce_result = await swarm.run_prompt(full_reduce, allowed_tools=allowed_tools)
     
     return {
         "items": items,
@@ -0,0 +1,197 @@
+"""SQLite-backed persistence for swarm state."""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import zlib
+from array import array
+from pathlib import Path
+from typing import Any
+
+import orjson
+
+from .swarm import HISTORY_LIMIT, Agent, SwarmState, _json_dumps
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS agents (
+    name TEXT PRIMARY KEY,
+    role TEXT NOT NULL,
+    system_prompt TEXT NOT NULL,
+    allowed_tools TEXT,
+    memory_blob BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS memory_embeddings (
+    agent TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    vector BLOB NOT NULL,
+    PRIMARY KEY (agent, idx)
+);
+CREATE TABLE IF NOT EXISTS shared_context (
+    key TEXT PRIMARY KEY,
+    value_json TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts TEXT NOT NULL,
+    agent TEXT,
+    task TEXT NOT NULL,
+    result_blob BLOB NOT NULL
+);
+"""
+
+
+def _dumps(obj: Any) -> str:
+    return _json_dumps(obj).decode()
+
+
+def _pack(obj: Any) -> bytes:
+    """Serialize compactly and compress, for memory and history payloads."""
+    return zlib.compress(_json_dumps(obj))
+
+
+def _unpack(blob: bytes) -> Any:
+    return orjson.loads(zlib.decompress(blob))
+
+
+class SwarmStore:
+    """
+    Persist swarm state in SQLite, writing only what changed.
+
+    Agents and shared context are upserted row by row and history is
+    append-only, so each interaction costs a single small write instead of
+    rewriting the whole state. Agent memory and history results are stored
+    as zlib-compressed compact JSON; memory embeddings are packed float32
+    rows of their own, written once per entry. The database runs in WAL mode so commands
+    like `manage list-agents` can read while another process writes.
+    """
+
+    def __init__(self, path: str | Path = ".swarm_state.db"):
+        self.path = Path(path)
+        self._conn = sqlite3.connect(self.path, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def __enter__(self) -> SwarmStore:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._conn.close()
+
+    def load(self, history_limit: int = HISTORY_LIMIT) -> SwarmState:
+        """Load agents, shared context, and the most recent history entries."""
+        agents = {
+            name: Agent(
+                name=name,
+                role=role,
+                system_prompt=system_prompt,
+                allowed_tools=orjson.loads(allowed_tools) if allowed_tools else None,
+                memory=_unpack(memory_blob),
+            )
+            for name, role, system_prompt, allowed_tools, memory_blob in self._conn.execute(
+                "SELECT name, role, system_prompt, allowed_tools, memory_blob FROM agents"
+            )
+        }
+        for name, idx, vector in self._conn.execute(
+            "SELECT agent, idx, vector FROM memory_embeddings"
+        ):
+            if name in agents:
+                agents[name].embeddings[idx] = array("f", vector)
+        # Context values are user-supplied; the stdlib keeps wide integers exact
+        shared_context = {
+            key: json.loads(value_json)
+            for key, value_json in self._conn.execute(
+                "SELECT key, value_json FROM shared_context"
+            )
+        }
+        history = [
+            {"timestamp": ts, "agent": agent, "task": task, "result": _unpack(result_blob)}
+            for ts, agent, task, result_blob in self._conn.execute(
+                "SELECT ts, agent, task, result_blob FROM "
+                "(SELECT * FROM history ORDER BY id DESC LIMIT ?) ORDER BY id",
+                (history_limit,),
+            )
+        ]
+        return SwarmState(agents=agents, shared_context=shared_context, history=history)
+
+    def save_agent(self, agent: Agent) -> None:
+        """Insert or replace an agent definition, including its memory."""
+        self._conn.execute("DELETE FROM memory_embeddings WHERE agent = ?", (agent.name,))
+        self._conn.executemany(
+            "INSERT INTO memory_embeddings (agent, idx, vector) VALUES (?, ?, ?)",
+            [(agent.name, idx, vector.tobytes()) for idx, vector in agent.embeddings.items()],
+        )
+        self._conn.execute(
+            "INSERT OR REPLACE INTO agents "
+            "(name, role, system_prompt, allowed_tools, memory_blob) VALUES (?, ?, ?, ?, ?)",
+            (
+                agent.name,
+                agent.role,
+                agent.system_prompt,
+                _dumps(agent.allowed_tools) if agent.allowed_tools is not None else None,
+                _pack(agent.memory),
+            ),
+        )
+
+    def save_memory(self, agent: Agent) -> None:
+        """Update only the memory of an existing agent."""
+        self._conn.execute(
+            "UPDATE agents SET memory_blob = ? WHERE name = ?",
+            (_pack(agent.memory), agent.name),
+        )
+
+    def save_embedding(self, agent: Agent, idx: int) -> None:
+        """Write the embedding of a single memory entry."""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO memory_embeddings (agent, idx, vector) VALUES (?, ?, ?)",
+            (agent.name, idx, agent.embeddings[idx].tobytes()),
+        )
+
+    def delete_agent(self, name: str) -> None:
+        """Remove an agent."""
+        self._conn.execute("DELETE FROM agents WHERE name = ?", (name,))
+        self._conn.execute("DELETE FROM memory_embeddings WHERE agent = ?", (name,))
+
+    def set_context(self, key: str, value: Any) -> None:
+        """Insert or replace a shared context entry."""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO shared_context (key, value_json) VALUES (?, ?)",
+            (key, _dumps(value)),
+        )
+
+    def clear_context(self) -> None:
+        """Remove all shared context entries."""
+        self._conn.execute("DELETE FROM shared_context")
+
+    def append_history(self, entry: dict) -> None:
+        """Append a single history entry."""
+        self._conn.execute(
+            "INSERT INTO history (ts, agent, task, result_blob) VALUES (?, ?, ?, ?)",
+            (entry["timestamp"], entry["agent"], entry["task"], _pack(entry["result"])),
+        )
+
+    def import_state(self, state: SwarmState) -> None:
+        """
+        Merge a JSON-snapshot state into the store in a single transaction.
+
+        Agents and context keys replace existing ones of the same name;
+        history entries are appended unless one with the same timestamp,
+        agent and task is already stored, so importing twice is harmless.
+        """
+        with self._conn:
+            self._conn.execute("BEGIN")
+            for agent in state.agents.values():
+                self.save_agent(agent)
+            for key, value in state.shared_context.items():
+                self.set_context(key, value)
+            seen = set(self._conn.execute("SELECT ts, agent, task FROM history"))
+            for entry in state.history:
+                key = (entry["timestamp"], entry["agent"], entry["task"])
+                if key not in seen:
+                    seen.add(key)
+                    self.append_history(entry)
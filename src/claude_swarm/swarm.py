@@ -3,11 +3,76 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
+import heapq
 import json
+import math
+import operator
+import os
+import time
+from array import array
+from collections import OrderedDict, deque
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any, Callable, Sequence
+
+import orjson
+
+from .api import (
+    DEFAULT_MAX_TOKENS,
+    DEFAULT_MODEL,
+    BatchExecutor,
+    create_client,
+    create_message,
+)
+
+if TYPE_CHECKING:
+    import httpx
+
+    from .persistence import SwarmStore
+
+# "cli" runs every prompt through a `claude` subprocess; "api" and "batch"
+# send tool-less prompts to the Anthropic Messages / Message Batches API.
+EXECUTION_MODES = ("cli", "api", "batch")
+
+# Max size of a single stream-json line; the final result event carries the
+# whole response text on one line
+STREAM_LINE_LIMIT = 32 * 1024 * 1024
+
+# Number of history entries kept in memory and in JSON snapshots
+HISTORY_LIMIT = 100
+
+
+def _json_dumps(obj: Any, option: int = 0) -> bytes:
+    """Serialize with orjson, falling back to the stdlib for what orjson rejects."""
+    try:
+        return orjson.dumps(obj, option=option | orjson.OPT_NON_STR_KEYS, default=str)
+    except TypeError:  # orjson.JSONEncodeError, e.g. integers wider than 64 bits
+        indent = 2 if option & orjson.OPT_INDENT_2 else None
+        return json.dumps(
+            obj,
+            indent=indent,
+            separators=None if indent else (",", ":"),
+            ensure_ascii=False,
+            default=str,
+        ).encode()
+
+
+def _normalize(vector: Sequence[float]) -> list[float]:
+    """Scale a vector to unit length so dot products are cosine similarities."""
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return [float(x) / norm for x in vector]
+
+
+def _atomic_write(path: Path, payload: bytes) -> None:
+    """Write via a temp file and rename so readers never see a partial file."""
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
 
 
 @dataclass
@@ -20,6 +85,52 @@ class Agent:
     memory: list[dict] = field(default_factory=list)
     allowed_tools: list[str] | None = None
     
+    def __post_init__(self) -> None:
+        # Normalized task embeddings by memory index, packed as float32 and
+        # kept out of the entries so they never reach prompts or to_dict()
+        self.embeddings: dict[int, array] = {}
+        # (memory key, serialized recent memory) reused by Swarm._build_prompt
+        self._memory_cache: tuple[tuple[int, int, int], str] | None = None
+    
+    def recent_memory_json(self) -> str:
+        """Serialize the last 5 memory entries compactly, cached until memory changes."""
+        # Keyed on the list and its last entry, so appends, trims and
+        # replacements all invalidate it
+        key = (
+            id(self.memory),
+            len(self.memory),
+            id(self.memory[-1]) if self.memory else 0,
+        )
+        if self._memory_cache is None or self._memory_cache[0] != key:
+            self._memory_cache = (
+                key,
+                _json_dumps(self.memory[-5:]).decode(),
+            )
+        return self._memory_cache[1]
+    
+    def relevant_memory_json(self, query: list[float], k: int = 5) -> str | None:
+        """
+        Serialize the `k` memory entries most similar to a normalized query embedding.
+        
+        Entries with an embedding of the query's dimension are ranked; leftover
+        slots are filled with the most recent other entries, so memory from
+        before the embedder was set still counts. Returns None if no entry can
+        be ranked. Selected entries keep their chronological order.
+        """
+        scored = [
+            (sum(map(operator.mul, query, vector)), i)
+            for i, vector in self.embeddings.items()
+            if i < len(self.memory) and len(vector) == len(query)
+        ]
+        if not scored:
+            return None
+        top = {i for _, i in heapq.nlargest(k, scored)}
+        for i in range(len(self.memory) - 1, -1, -1):
+            if len(top) >= k:
+                break
+            top.add(i)
+        return _json_dumps([self.memory[i] for i in sorted(top)]).decode()
+    
     def to_dict(self) -> dict:
         return {
             "name": self.name,
@@ -40,15 +151,24 @@ class SwarmState:
     
     agents: dict[str, Agent] = field(default_factory=dict)
     shared_context: dict[str, Any] = field(default_factory=dict)
-    history: list[dict] = field(default_factory=list)
+    history: deque[dict] = field(default_factory=lambda: deque(maxlen=HISTORY_LIMIT))
     
-    def save(self, path: str | Path = ".swarm_state.json") -> None:
-        """Save swarm state to disk."""
-        Path(path).write_text(json.dumps({
+    def __post_init__(self) -> None:
+        # Accept any iterable (e.g. a list from JSON) but keep memory bounded
+        if not isinstance(self.history, deque) or self.history.maxlen != HISTORY_LIMIT:
+            self.history = deque(self.history, maxlen=HISTORY_LIMIT)
+    
+    def to_json(self) -> bytes:
+        """Serialize swarm state as compact JSON."""
+        return _json_dumps({
             "agents": {k: v.to_dict() for k, v in self.agents.items()},
             "shared_context": self.shared_context,
-            "history": self.history[-100:],  # Keep last 100 entries
-        }, indent=2, default=str))
+            "history": list(self.history),
+        })
+    
+    def save(self, path: str | Path = ".swarm_state.json") -> None:
+        """Save swarm state to disk as compact JSON, replacing the file atomically."""
+        _atomic_write(Path(path), self.to_json())
     
     @classmethod
     def load(cls, path: str | Path = ".swarm_state.json") -> SwarmState:
@@ -57,11 +177,11 @@ class SwarmState:
         if not path.exists():
             return cls()
         
-        data = json.loads(path.read_text())
+        data = orjson.loads(path.read_bytes())
         return cls(
             agents={k: Agent.from_dict(v) for k, v in data.get("agents", {}).items()},
             shared_context=data.get("shared_context", {}),
-            history=data.get("history", []),
+            history=deque(data.get("history", []), maxlen=HISTORY_LIMIT),
         )
 
 
@@ -74,12 +194,101 @@ class Swarm:
         max_concurrent: int = 5,
         cwd: str | Path = ".",
         output_format: str = "json",
+        execution_mode: str = "cli",
+        model: str = DEFAULT_MODEL,
+        max_tokens: int = DEFAULT_MAX_TOKENS,
+        store: SwarmStore | None = None,
+        cache_size: int = 0,
+        cache_ttl: float | None = None,
+        embedder: Callable[[str], Sequence[float]] | None = None,
+        batch_window_ms: float = 10,
     ):
-        self.state = state or SwarmState()
+        if execution_mode not in EXECUTION_MODES:
+            raise ValueError(
+                f"Unknown execution mode: {execution_mode}. "
+                f"Available: {', '.join(EXECUTION_MODES)}"
+            )
+        # When a store is given, every change is written through to it
+        self.store = store
+        self.state = state or (store.load() if store is not None else SwarmState())
         self.max_concurrent = max_concurrent
-        self.semaphore = asyncio.Semaphore(max_concurrent)
+        # max_concurrent workers consume (prompt, tools, cwd, on_event, future)
+        # items; started on first use since they need a running event loop
+        self._queue: asyncio.Queue[tuple[
+            str, list[str] | None, str | None, Callable[[dict], None] | None, asyncio.Future,
+        ]] | None = None
+        self._workers: list[asyncio.Task] = []
+        self._loop: asyncio.AbstractEventLoop | None = None
         self.cwd = Path(cwd).resolve()
+        # Resolved once; subprocesses take the string form on every call
+        self._cwd_str = str(self.cwd)
         self.output_format = output_format
+        # Serialized shared context, reused until update_context/clear_context
+        # or until state.shared_context is replaced
+        self._ctx_version = 0
+        self._ctx_cache: tuple[tuple[int, int], str] | None = None
+        self.execution_mode = execution_mode
+        self.model = model
+        self.max_tokens = max_tokens
+        # Optional text -> vector function; when set, agents recall the memory
+        # entries most relevant to the task instead of the most recent ones
+        self.embedder = embedder
+        # LRU of successful results keyed by (prompt, tools, cwd); 0 disables it
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self._cache: OrderedDict[bytes, tuple[float, dict[str, Any]]] = OrderedDict()
+        # One pooled keep-alive client per swarm, shared by every API request;
+        # created on first use by _api_client(), so CLI-only use needs no API key
+        self._http: httpx.AsyncClient | None = None
+        self._http_loop: asyncio.AbstractEventLoop | None = None
+        self._batch: BatchExecutor | None = None
+        self._batch_window = batch_window_ms / 1000
+    
+    async def __aenter__(self) -> Swarm:
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+    
+    async def aclose(self) -> None:
+        """Stop the worker pool and batches, and close the HTTP connection pool, if any."""
+        # A pool started under an earlier asyncio.run() died with its loop, so
+        # there is nothing left to cancel or resolve; just drop it
+        if self._loop is asyncio.get_running_loop():
+            for worker in self._workers:
+                worker.cancel()
+            await asyncio.gather(*self._workers, return_exceptions=True)
+            self._fail_queued(self._queue)
+        self._workers = []
+        self._queue = None
+        self._loop = None
+        if self._http is not None and self._http_loop is asyncio.get_running_loop():
+            # Stop batches before closing the client they poll with
+            if self._batch is not None:
+                await self._batch.aclose()
+            await self._http.aclose()
+        self._http = None
+        self._batch = None
+    
+    def _api_client(self) -> httpx.AsyncClient:
+        """
+        Return the pooled API client, creating it when needed.
+        
+        A new client (and batch executor) is made on first use, after
+        aclose(), and when the swarm is reused from a new event loop.
+        """
+        loop = asyncio.get_running_loop()
+        if self._http is None or self._http.is_closed or self._http_loop is not loop:
+            self._http = create_client(self.max_concurrent * 2)
+            self._http_loop = loop
+            if self.execution_mode == "batch":
+                self._batch = BatchExecutor(
+                    self._http,
+                    model=self.model,
+                    max_tokens=self.max_tokens,
+                    window=self._batch_window,
+                )
+        return self._http
     
     def add_agent(
         self,
@@ -96,60 +305,293 @@ class Swarm:
             allowed_tools=allowed_tools,
         )
         self.state.agents[name] = agent
+        if self.store is not None:
+            self.store.save_agent(agent)
         return agent
     
     def remove_agent(self, name: str) -> bool:
         """Remove an agent from the swarm."""
         if name in self.state.agents:
             del self.state.agents[name]
+            if self.store is not None:
+                self.store.delete_agent(name)
             return True
         return False
     
     def update_context(self, key: str, value: Any) -> None:
-        """Update shared context available to all agents."""
+        """
+        Update shared context available to all agents.
+        
+        Prompts reuse the serialized context until the next update, so after
+        mutating a stored value in place, pass it here again.
+        """
         self.state.shared_context[key] = value
+        self._ctx_version += 1
+        if self.store is not None:
+            self.store.set_context(key, value)
     
     def clear_context(self) -> None:
         """Clear all shared context."""
         self.state.shared_context.clear()
+        self._ctx_version += 1
+        if self.store is not None:
+            self.store.clear_context()
+    
+    def clear_cache(self) -> None:
+        """Drop all cached results."""
+        self._cache.clear()
+    
+    def _cache_key(self, prompt: str, allowed_tools: list[str] | None, cwd: str) -> bytes:
+        return hashlib.blake2b(b"\0".join([
+            prompt.encode(),
+            ",".join(sorted(allowed_tools or ())).encode(),
+            cwd.encode(),
+        ])).digest()
     
     async def _invoke_claude(
         self,
         prompt: str,
         allowed_tools: list[str] | None = None,
-        cwd: Path | None = None,
+        cwd: str | None = None,
+        on_event: Callable[[dict], None] | None = None,
     ) -> dict[str, Any]:
-        """Run a single Claude Code instance."""
-        async with self.semaphore:
-            cmd = ["claude", "-p", prompt, "--output-format", self.output_format]
-            
-            if allowed_tools:
-                cmd.extend(["--allowedTools", ",".join(allowed_tools)])
-            
-            proc = await asyncio.create_subprocess_exec(
-                *cmd,
-                cwd=str(cwd or self.cwd),
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-            )
+        """
+        Run a single Claude Code instance, reusing cached results if enabled.
+        
+        `on_event` is called with each stream-json event as the CLI emits it.
+        """
+        if not self.cache_size:
+            return await self._execute(prompt, allowed_tools, cwd, on_event)
+        
+        key = self._cache_key(prompt, allowed_tools, cwd or self._cwd_str)
+        cached = self._cache.get(key)
+        if cached is not None:
+            stored_at, result = cached
+            if self.cache_ttl is None or time.monotonic() - stored_at < self.cache_ttl:
+                self._cache.move_to_end(key)
+                return result
+            del self._cache[key]
+        
+        result = await self._execute(prompt, allowed_tools, cwd, on_event)
+        if result["success"]:
+            self._cache[key] = (time.monotonic(), result)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+    
+    async def _execute(
+        self,
+        prompt: str,
+        allowed_tools: list[str] | None = None,
+        cwd: str | None = None,
+        on_event: Callable[[dict], None] | None = None,
+    ) -> dict[str, Any]:
+        """Hand a prompt to the batch executor or the worker pool."""
+        # Batches are a single request, so they bypass the worker pool
+        if self.execution_mode == "batch" and not allowed_tools:
+            self._api_client()
+            return await self._batch.submit(prompt)
+        
+        # Start the pool on first use, and again whenever the swarm is reused
+        # from a new event loop (workers and queued prompts die with their loop)
+        loop = asyncio.get_running_loop()
+        if self._queue is None or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self.max_concurrent * 2)
+            self._workers = []
+        # Replace any worker that has died; the queue and its prompts are kept
+        self._workers = [worker for worker in self._workers if not worker.done()]
+        while len(self._workers) < self.max_concurrent:
+            self._workers.append(asyncio.create_task(self._worker_loop(self._queue)))
+        
+        queue = self._queue
+        future = loop.create_future()
+        await queue.put((prompt, allowed_tools, cwd, on_event, future))
+        if queue is not self._queue:
+            # aclose() ran while we waited for a slot in the queue
+            self._fail_queued(queue)
+        return await future
+    
+    @staticmethod
+    def _fail_queued(queue: asyncio.Queue | None) -> None:
+        """Fail every prompt still waiting in a stopped pool's queue."""
+        while queue is not None:
+            try:
+                *_, future = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            if not future.done():
+                future.set_exception(RuntimeError("Swarm was closed before the prompt ran"))
+            queue.task_done()
+    
+    async def _worker_loop(self, queue: asyncio.Queue) -> None:
+        """Run queued prompts one at a time until cancelled by aclose()."""
+        while True:
+            prompt, allowed_tools, cwd, on_event, future = await queue.get()
+            run = None
+            try:
+                if future.done():
+                    continue
+                run = asyncio.ensure_future(self._run(prompt, allowed_tools, cwd, on_event))
+                # If the caller gives up (e.g. a wait_for timeout), stop the run so
+                # the slot frees up; cancelling kills the claude process
+                await asyncio.wait({run, future}, return_when=asyncio.FIRST_COMPLETED)
+                if future.done():
+                    run.cancel()
+                    await asyncio.gather(run, return_exceptions=True)
+                elif run.exception() is not None:
+                    future.set_exception(run.exception())
+                else:
+                    future.set_result(run.result())
+            except asyncio.CancelledError:
+                if run is not None:
+                    run.cancel()
+                    await asyncio.gather(run, return_exceptions=True)
+                future.cancel()
+                raise
+            finally:
+                queue.task_done()
+    
+    async def _run(
+        self,
+        prompt: str,
+        allowed_tools: list[str] | None = None,
+        cwd: str | None = None,
+        on_event: Callable[[dict], None] | None = None,
+    ) -> dict[str, Any]:
+        """Run a prompt through the Messages API or a `claude` subprocess."""
+        # Tool-enabled prompts need Claude Code itself, so they always use the CLI
+        if self.execution_mode != "cli" and not allowed_tools:
+            return await create_message(self._api_client(), prompt, self.model, self.max_tokens)
+        
+        proc = await self.spawn(allowed_tools, cwd)
+        return await self._communicate(proc, prompt, on_event)
+    
+    async def spawn(
+        self,
+        allowed_tools: list[str] | None = None,
+        cwd: str | None = None,
+    ) -> asyncio.subprocess.Process:
+        """
+        Start a `claude` process that waits for its prompt on stdin.
+        
+        Lets callers hide process startup behind other work; pass the
+        process to `run_prompt` to send it a prompt.
+        """
+        cmd = ["claude", "-p"]
+        # JSON output is read as stream-json so events are parsed as they arrive
+        if self.output_format == "json":
+            cmd.extend(["--output-format", "stream-json", "--verbose"])
+        else:
+            cmd.extend(["--output-format", self.output_format])
+        
+        if allowed_tools:
+            cmd.extend(["--allowedTools", ",".join(allowed_tools)])
+        
+        return await asyncio.create_subprocess_exec(
+            *cmd,
+            cwd=cwd or self._cwd_str,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            limit=STREAM_LINE_LIMIT,
+        )
+    
+    async def _communicate(
+        self,
+        proc: asyncio.subprocess.Process,
+        prompt: str,
+        on_event: Callable[[dict], None] | None = None,
+    ) -> dict[str, Any]:
+        """Send a prompt to a spawned `claude` process and collect its result."""
+        try:
+            if self.output_format != "json":
+                stdout, stderr = await proc.communicate(prompt.encode())
+                if proc.returncode != 0:
+                    return {
+                        "success": False,
+                        "error": stderr.decode().strip(),
+                        "returncode": proc.returncode,
+                    }
+                return {"success": True, "result": stdout.decode().strip()}
             
-            stdout, stderr = await proc.communicate()
+            # Drain stderr concurrently so a full pipe can't stall the process
+            stderr_task = asyncio.create_task(proc.stderr.read())
+            try:
+                proc.stdin.write(prompt.encode())
+                await proc.stdin.drain()
+                proc.stdin.close()
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # Process exited early; its stderr and returncode say why
             
-            if proc.returncode != 0:
+            result = None
+            # Lines that aren't stream-json events, in case claude printed plain output
+            raw = []
+            try:
+                async for line in proc.stdout:
+                    try:
+                        event = orjson.loads(line)
+                    except orjson.JSONDecodeError:
+                        event = None
+                    if not isinstance(event, dict) or "type" not in event:
+                        raw.append(line)
+                        continue
+                    if on_event is not None:
+                        on_event(event)
+                    # Keep only the final result; intermediate events are discarded
+                    if event["type"] == "result":
+                        result = event
+            except ValueError:
+                # A line longer than STREAM_LINE_LIMIT; fail this prompt only
+                stderr_task.cancel()
                 return {
                     "success": False,
-                    "error": stderr.decode().strip(),
-                    "returncode": proc.returncode,
+                    "error": f"claude output line exceeded {STREAM_LINE_LIMIT} bytes",
                 }
-            
+            stderr = await stderr_task
+            await proc.wait()
+        finally:
+            if proc.returncode is None:
+                proc.kill()
+                await proc.wait()
+        
+        if proc.returncode != 0:
+            return {
+                "success": False,
+                "error": stderr.decode().strip(),
+                "returncode": proc.returncode,
+            }
+        if result is None:
+            if not raw:
+                return {"success": False, "error": "claude exited without a result event"}
+            # Not stream-json; return the output as JSON if it is, else as text
+            output = b"".join(raw).decode()
             try:
-                result = json.loads(stdout.decode())
-                return {"success": True, "result": result}
-            except json.JSONDecodeError:
-                return {"success": True, "result": stdout.decode().strip()}
+                return {"success": True, "result": orjson.loads(output)}
+            except orjson.JSONDecodeError:
+                return {"success": True, "result": output.strip()}
+        return {"success": True, "result": result}
     
-    def _build_prompt(self, agent: Agent, task: str) -> str:
-        """Build the full prompt for an agent including context and memory."""
+    def _shared_context_json(self) -> str:
+        """Serialize shared context once per context version."""
+        key = (self._ctx_version, id(self.state.shared_context))
+        if self._ctx_cache is None or self._ctx_cache[0] != key:
+            self._ctx_cache = (key, _json_dumps(
+                self.state.shared_context, orjson.OPT_INDENT_2,
+            ).decode())
+        return self._ctx_cache[1]
+    
+    def _build_prompt(
+        self,
+        agent: Agent,
+        task: str,
+        query: list[float] | None = None,
+    ) -> str:
+        """
+        Build the full prompt for an agent including context and memory.
+        
+        `query` is the normalized task embedding used for relevance recall.
+        """
         parts = []
         
         # Agent identity
@@ -160,48 +602,75 @@ class Swarm:
         
         # Shared context
         if self.state.shared_context:
-            parts.append(f"\n## Shared Context\n{json.dumps(self.state.shared_context, indent=2)}")
+            parts.append(f"\n## Shared Context\n{self._shared_context_json()}")
         
-        # Agent memory (last 5 interactions)
+        # Agent memory (5 most relevant interactions, or the last 5)
         if agent.memory:
-            recent = agent.memory[-5:]
-            parts.append(f"\n## Your Recent Memory\n{json.dumps(recent, indent=2)}")
+            relevant = agent.relevant_memory_json(query) if query is not None else None
+            if relevant is not None:
+                parts.append(f"\n## Your Relevant Memory\n{relevant}")
+            else:
+                parts.append(f"\n## Your Recent Memory\n{agent.recent_memory_json()}")
         
         # The task
         parts.append(f"\n## Task\n{task}")
         
         return "\n\n".join(parts)
     
+    async def _embed(self, task: str) -> list[float] | None:
+        """Embed a task off the event loop, if an embedder is set."""
+        if self.embedder is None:
+            return None
+        return _normalize(await asyncio.to_thread(self.embedder, task))
+    
     async def invoke(self, agent_name: str, task: str) -> dict[str, Any]:
         """Invoke a specific agent with a task."""
         if agent_name not in self.state.agents:
             return {"success": False, "error": f"Agent '{agent_name}' not found"}
-        
+        return await self._invoke(agent_name, task, await self._embed(task))
+    
+    async def _invoke(
+        self,
+        agent_name: str,
+        task: str,
+        query: list[float] | None,
+    ) -> dict[str, Any]:
         agent = self.state.agents[agent_name]
-        prompt = self._build_prompt(agent, task)
+        prompt = self._build_prompt(agent, task, query)
         result = await self._invoke_claude(prompt, agent.allowed_tools)
         
         # Update agent memory
-        agent.memory.append({
+        entry = {
             "timestamp": datetime.now().isoformat(),
             "task": task,
             "result": result.get("result") if result["success"] else result.get("error"),
             "success": result["success"],
-        })
+        }
+        if query is not None:
+            agent.embeddings[len(agent.memory)] = array("f", query)
+        agent.memory.append(entry)
+        if self.store is not None:
+            self.store.save_memory(agent)
+            if query is not None:
+                self.store.save_embedding(agent, len(agent.memory) - 1)
         
         # Log to history
-        self.state.history.append({
-            "timestamp": datetime.now().isoformat(),
-            "agent": agent_name,
-            "task": task,
-            "result": result,
-        })
+        self._log_history(agent_name, task, result)
         
         return {"agent": agent_name, **result}
     
     async def dispatch(self, assignments: dict[str, str]) -> list[dict[str, Any]]:
         """Dispatch tasks to multiple agents in parallel."""
-        tasks = [self.invoke(name, task) for name, task in assignments.items()]
+        # Embed each distinct task once, e.g. a broadcast embeds a single task
+        distinct = list(dict.fromkeys(
+            task for name, task in assignments.items() if name in self.state.agents
+        ))
+        queries = dict(zip(distinct, await asyncio.gather(*map(self._embed, distinct))))
+        tasks = [
+            self._invoke(name, task, queries[task])
+            if name in self.state.agents else self.invoke(name, task)
+            for name, task in assignments.items()
+        ]
         return await asyncio.gather(*tasks)
     
     async def broadcast(self, task: str) -> list[dict[str, Any]]:
@@ -212,23 +681,44 @@ class Swarm:
         self,
         prompt: str,
         allowed_tools: list[str] | None = None,
+        on_event: Callable[[dict], None] | None = None,
+        process: asyncio.subprocess.Process | None = None,
     ) -> dict[str, Any]:
-        """Run a raw prompt without an agent context."""
-        result = await self._invoke_claude(prompt, allowed_tools=allowed_tools)
+        """
+        Run a raw prompt without an agent context.
         
-        self.state.history.append({
+        If `process` comes from `spawn()`, the prompt is sent to it directly,
+        bypassing the result cache and the worker pool.
+        """
+        if process is not None:
+            result = await self._communicate(process, prompt, on_event)
+        else:
+            result = await self._invoke_claude(prompt, allowed_tools=allowed_tools, on_event=on_event)
+        self._log_history(None, prompt, result)
+        return result
+    
+    def _log_history(self, agent_name: str | None, task: str, result: dict[str, Any]) -> None:
+        """Record an interaction in history and the store, if any."""
+        entry = {
             "timestamp": datetime.now().isoformat(),
-            "agent": None,
-            "task": prompt,
+            "agent": agent_name,
+            "task": task,
             "result": result,
-        })
-        
-        return result
+        }
+        self.state.history.append(entry)
+        if self.store is not None:
+            self.store.append_history(entry)
     
     def save(self, path: str | Path = ".swarm_state.json") -> None:
-        """Save swarm state."""
+        """Save swarm state as a JSON snapshot."""
         self.state.save(path)
     
+    async def asave(self, path: str | Path = ".swarm_state.json") -> None:
+        """Save swarm state as a JSON snapshot without blocking the event loop on disk IO."""
+        # Serialize on the loop so agents can't mutate state mid-dump
+        payload = self.state.to_json()
+        await asyncio.to_thread(_atomic_write, Path(path), payload)
+    
     @classmethod
     def load(
         cls,
@@ -0,0 +1,126 @@
+"""Shared fixtures: a stub `claude` executable and a mocked Anthropic API."""
+
+from __future__ import annotations
+
+import json
+import os
+import stat
+import sys
+from pathlib import Path
+
+import pytest
+
+from claude_swarm import swarm as swarm_module
+
+# Reads the prompt from stdin and answers with stream-json events (or plain
+# text). FAKE_DELAY sleeps before the result; FAKE_PIDS logs each process.
+STUB_CLAUDE = """\
+import json, os, sys, time
+
+if os.environ.get("FAKE_PIDS"):
+    with open(os.environ["FAKE_PIDS"], "a") as f:
+        f.write(f"{os.getpid()}\\n")
+prompt = sys.stdin.read()
+fmt = sys.argv[sys.argv.index("--output-format") + 1]
+mode = os.environ.get("FAKE_MODE", "ok")
+time.sleep(float(os.environ.get("FAKE_DELAY", "0")))
+text = "echo:" + prompt.rsplit("\\n", 1)[-1]
+
+if mode == "fail":
+    sys.stderr.write("boom")
+    sys.exit(2)
+elif mode == "text":
+    print("plain answer")
+elif mode == "huge":
+    sys.stdout.write("a" * (int(os.environ["FAKE_LINE_SIZE"]) + 1) + "\\n")
+elif fmt == "stream-json":
+    print(json.dumps({"type": "system", "subtype": "init"}))
+    print(json.dumps({"type": "result", "result": text}))
+else:
+    print(text)
+"""
+
+
+@pytest.fixture
+def fake_claude(tmp_path, monkeypatch):
+    """Put a stub `claude` first on PATH and return a dict for its env knobs."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    script = bin_dir / "claude"
+    script.write_text(f"#!{sys.executable}\n{STUB_CLAUDE}")
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("FAKE_PIDS", str(tmp_path / "pids"))
+    return tmp_path
+
+
+def spawned_pids(tmp_path: Path) -> list[int]:
+    """PIDs of every stub `claude` process started so far."""
+    pids = tmp_path / "pids"
+    return [int(line) for line in pids.read_text().split()] if pids.exists() else []
+
+
+class FakeAPI:
+    """Minimal Messages / Message Batches API behind an httpx.MockTransport."""
+
+    def __init__(self):
+        self.messages = 0
+        self.batches: list[list[dict]] = []
+        self.batch_status = "ended"
+
+    def handler(self, request):
+        import httpx
+
+        path, method = request.url.path, request.method
+        if path == "/v1/messages" and method == "POST":
+            self.messages += 1
+            prompt = json.loads(request.content)["messages"][0]["content"]
+            return httpx.Response(200, json={
+                "content": [{"type": "text", "text": f"direct:{prompt}"}],
+                "model": "m",
+                "stop_reason": "end_turn",
+                "usage": {},
+            })
+        if path == "/v1/messages/batches" and method == "POST":
+            self.batches.append(json.loads(request.content)["requests"])
+            return httpx.Response(200, json=self._batch())
+        if path == "/v1/messages/batches/b1":
+            return httpx.Response(200, json=self._batch())
+        if path == "/results/b1":
+            # Reversed, so results must be matched by custom_id, not position
+            lines = [
+                json.dumps({
+                    "custom_id": r["custom_id"],
+                    "result": {"type": "succeeded", "message": {"content": [
+                        {"type": "text", "text": "batch:" + r["params"]["messages"][0]["content"]},
+                    ]}},
+                })
+                for r in reversed(self.batches[-1])
+            ]
+            return httpx.Response(200, text="\n".join(lines))
+        return httpx.Response(404, json={"error": {"message": "not found"}})
+
+    def _batch(self) -> dict:
+        return {
+            "id": "b1",
+            "processing_status": self.batch_status,
+            "results_url": "https://api.anthropic.com/results/b1",
+        }
+
+
+@pytest.fixture
+def fake_api(monkeypatch):
+    """Route every swarm API client to a FakeAPI."""
+    httpx = pytest.importorskip("httpx")
+    from claude_swarm.api import API_URL
+
+    fake = FakeAPI()
+    monkeypatch.setattr(
+        swarm_module,
+        "create_client",
+        lambda max_connections: httpx.AsyncClient(
+            base_url=API_URL,
+            transport=httpx.MockTransport(fake.handler),
+        ),
+    )
+    return fake
@@ -0,0 +1,68 @@
+"""API and batch execution modes against a mocked Anthropic API."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from claude_swarm import Swarm
+from claude_swarm.patterns import fan_out
+
+
+def test_batch_results_routed_by_custom_id(fake_api):
+    results = asyncio.run(fan_out(["a", "b", "c"], execution_mode="batch"))
+    assert [r["result"]["result"] for r in results] == ["batch:a", "batch:b", "batch:c"]
+    assert len(fake_api.batches) == 1
+    assert fake_api.messages == 0
+
+
+def test_single_prompt_window_skips_batch(fake_api):
+    results = asyncio.run(fan_out(["solo"], execution_mode="batch"))
+    assert results[0]["result"]["result"] == "direct:solo"
+    assert fake_api.batches == []
+
+
+def test_tool_prompts_use_cli_in_batch_mode(fake_api, fake_claude):
+    result = asyncio.run(Swarm(execution_mode="batch").run_prompt("x", allowed_tools=["Read"]))
+    assert result["result"]["result"] == "echo:x"
+    assert fake_api.messages == 0 and fake_api.batches == []
+
+
+@pytest.mark.parametrize("mode", ["api", "batch"])
+def test_swarm_usable_after_aclose(fake_api, mode):
+    swarm = Swarm(execution_mode=mode)
+
+    async def run(prompt):
+        async with swarm:
+            return await swarm.run_prompt(prompt)
+
+    assert asyncio.run(run("one"))["success"]
+    assert asyncio.run(run("two"))["success"]
+
+
+def test_cli_mode_needs_no_api_key(fake_claude, monkeypatch):
+    monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+    swarm = Swarm(execution_mode="api")
+    assert asyncio.run(swarm.run_prompt("x", allowed_tools=["Read"]))["success"]
+
+
+def test_aclose_stops_polling_batches(fake_api):
+    fake_api.batch_status = "in_progress"
+
+    async def main():
+        swarm = Swarm(execution_mode="batch")
+        swarm._api_client()
+        swarm._batch.poll_interval = 0.05
+        polling = [asyncio.create_task(swarm.run_prompt(p)) for p in "abc"]
+        await asyncio.sleep(0.3)
+        queued = asyncio.create_task(swarm.run_prompt("late"))
+        await asyncio.sleep(0)
+        await swarm.aclose()
+        done, pending = await asyncio.wait(polling + [queued], timeout=2)
+        return polling, queued, pending
+
+    polling, queued, pending = asyncio.run(main())
+    assert not pending
+    assert all(task.cancelled() for task in polling)
+    assert isinstance(queued.exception(), RuntimeError)
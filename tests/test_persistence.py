@@ -0,0 +1,88 @@
+"""SwarmStore round-trips, JSON snapshots, and prompt-building caches."""
+
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+from array import array
+
+from claude_swarm import Agent, Swarm, SwarmState, SwarmStore
+
+
+def _embed(text: str) -> list[float]:
+    return [float(len(text)), 1.0, 0.0]
+
+
+def test_store_round_trip(tmp_path, fake_claude):
+    path = tmp_path / "state.db"
+
+    async def main():
+        with SwarmStore(path) as store:
+            async with Swarm(store=store, embedder=_embed) as swarm:
+                swarm.add_agent("dev", role="Developer", allowed_tools=["Read"])
+                swarm.update_context("big", 2**70)
+                await swarm.invoke("dev", "task one")
+                await swarm.run_prompt("raw")
+
+    asyncio.run(main())
+    with SwarmStore(path) as store:
+        state = store.load()
+
+    agent = state.agents["dev"]
+    assert agent.allowed_tools == ["Read"]
+    assert [m["task"] for m in agent.memory] == ["task one"]
+    assert "embedding" not in agent.memory[0]
+    assert agent.embeddings[0].typecode == "f"
+    assert state.shared_context == {"big": 2**70}
+    assert [(h["agent"], h["task"]) for h in state.history] == [("dev", "task one"), (None, "raw")]
+
+
+def test_import_state_is_idempotent(tmp_path):
+    state = SwarmState(
+        agents={"dev": Agent("dev", "Developer")},
+        shared_context={"k": [1, 2]},
+        history=[{"timestamp": "t", "agent": "dev", "task": "x", "result": {"success": True}}],
+    )
+    with SwarmStore(tmp_path / "state.db") as store:
+        store.import_state(state)
+        store.import_state(state)
+        loaded = store.load()
+    assert list(loaded.agents) == ["dev"]
+    assert loaded.shared_context == {"k": [1, 2]}
+    assert len(loaded.history) == 1
+
+
+def test_json_snapshot_round_trip(tmp_path):
+    swarm = Swarm()
+    swarm.add_agent("dev", "Developer")
+    swarm.update_context("big", 2**70)
+    path = tmp_path / "state.json"
+    asyncio.run(swarm.asave(path))
+    loaded = Swarm.load(path).state
+    assert list(loaded.agents) == ["dev"]
+    assert "big" in loaded.shared_context
+
+
+def test_memory_cache_tracks_replaced_entries():
+    agent = Agent("a", "r", memory=[{"n": 1}, {"n": 2}])
+    assert agent.recent_memory_json() == '[{"n":1},{"n":2}]'
+    agent.memory[-1] = {"n": 3}
+    assert agent.recent_memory_json() == '[{"n":1},{"n":3}]'
+    assert [f.name for f in dataclasses.fields(agent)] == [
+        "name", "role", "system_prompt", "memory", "allowed_tools",
+    ]
+
+
+def test_context_cache_tracks_new_state():
+    swarm = Swarm()
+    swarm.update_context("a", 1)
+    assert '"a"' in swarm._shared_context_json()
+    swarm.state = SwarmState(shared_context={"b": 2})
+    assert '"b"' in swarm._shared_context_json()
+
+
+def test_relevant_memory_fills_from_recent_and_skips_other_dims():
+    agent = Agent("a", "r", memory=[{"n": i} for i in range(10)])
+    agent.embeddings[2] = array("f", [1.0, 0.0])
+    agent.embeddings[9] = array("f", [1.0, 0.0, 0.0])
+    assert agent.relevant_memory_json([1.0, 0.0], k=3) == '[{"n":2},{"n":8},{"n":9}]'
@@ -0,0 +1,116 @@
+"""Worker pool lifecycle, caller timeouts, and stream-json parsing."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+
+import pytest
+
+from claude_swarm import Swarm, swarm as swarm_module
+from conftest import spawned_pids
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+def test_run_prompt_returns_result_event(fake_claude):
+    result = asyncio.run(Swarm().run_prompt("hello"))
+    assert result == {"success": True, "result": {"type": "result", "result": "echo:hello"}}
+
+
+def test_aclose_fails_queued_prompts(fake_claude, monkeypatch):
+    monkeypatch.setenv("FAKE_DELAY", "2")
+
+    async def main():
+        swarm = Swarm(max_concurrent=1)
+        tasks = [asyncio.create_task(swarm.run_prompt(f"p{i}")) for i in range(4)]
+        await asyncio.sleep(0.3)
+        await swarm.aclose()
+        done, pending = await asyncio.wait(tasks, timeout=5)
+        return tasks, pending
+
+    tasks, pending = asyncio.run(main())
+    assert not pending
+    assert tasks[0].cancelled()
+    for task in tasks[1:]:
+        assert isinstance(task.exception(), RuntimeError)
+
+
+def test_swarm_reused_across_event_loops(fake_claude):
+    swarm = Swarm()
+    assert asyncio.run(swarm.run_prompt("one"))["success"]
+    assert asyncio.run(swarm.run_prompt("two"))["success"]
+    # Closing from a new loop drops the old pool instead of touching its loop
+    asyncio.run(swarm.aclose())
+    assert asyncio.run(swarm.run_prompt("three"))["success"]
+
+
+def test_dead_worker_is_replaced_without_losing_prompts(fake_claude):
+    async def main():
+        async with Swarm(max_concurrent=2) as swarm:
+            await swarm.run_prompt("warm")
+            swarm._workers[0].cancel()
+            await asyncio.sleep(0)
+            results = await asyncio.gather(*(swarm.run_prompt(f"q{i}") for i in range(4)))
+            return results, len(swarm._workers)
+
+    results, workers = asyncio.run(main())
+    assert all(r["success"] for r in results)
+    assert workers == 2
+
+
+def test_caller_timeout_kills_process_and_frees_slot(fake_claude, monkeypatch):
+    monkeypatch.setenv("FAKE_DELAY", "30")
+
+    async def main():
+        async with Swarm(max_concurrent=1) as swarm:
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(swarm.run_prompt("slow"), 0.5)
+            await asyncio.sleep(0.2)
+            [pid] = spawned_pids(fake_claude)
+            assert not _alive(pid)
+            monkeypatch.setenv("FAKE_DELAY", "0")
+            return await asyncio.wait_for(swarm.run_prompt("fast"), 5)
+
+    assert asyncio.run(main())["success"]
+
+
+def test_failed_process_returns_error(fake_claude, monkeypatch):
+    monkeypatch.setenv("FAKE_MODE", "fail")
+    result = asyncio.run(Swarm().run_prompt("x"))
+    assert result == {"success": False, "error": "boom", "returncode": 2}
+
+
+def test_plain_output_falls_back_to_text(fake_claude, monkeypatch):
+    monkeypatch.setenv("FAKE_MODE", "text")
+    assert asyncio.run(Swarm().run_prompt("x")) == {"success": True, "result": "plain answer"}
+
+
+def test_oversized_line_fails_only_that_prompt(fake_claude, monkeypatch):
+    monkeypatch.setattr(swarm_module, "STREAM_LINE_LIMIT", 1024)
+    monkeypatch.setenv("FAKE_MODE", "huge")
+    monkeypatch.setenv("FAKE_LINE_SIZE", "4096")
+
+    async def main():
+        async with Swarm() as swarm:
+            return await asyncio.gather(swarm.run_prompt("a"), swarm.run_prompt("b"))
+
+    results = asyncio.run(main())
+    assert [r["success"] for r in results] == [False, False]
+    assert "exceeded" in results[0]["error"]
+
+
+def test_result_cache_skips_second_run(fake_claude):
+    async def main():
+        async with Swarm(cache_size=8) as swarm:
+            await swarm.run_prompt("same")
+            await swarm.run_prompt("same")
+
+    asyncio.run(main())
+    assert len(spawned_pids(fake_claude)) == 1